@@ -8,19 +8,46 @@ Core utilities for the NPA workshop system:
 - Slack alerting
 """
 
+import asyncio
+import hashlib
+import itertools
 import os
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
-import yaml
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Callable, Coroutine, Tuple
+from datetime import datetime, timedelta, timezone
 
-from google.cloud import bigquery
-import openai
+from cachetools import TTLCache
+from cachetools.keys import hashkey
+import orjson
+
+# Heavy third-party modules (BigQuery, OpenAI, YAML, requests) are imported
+# inside the classes that use them, so importing this module stays cheap
+if TYPE_CHECKING:
+    import openai
+    import pyarrow
+    from google.cloud import bigquery
 
 
 class BigQueryConnector:
     """Handle BigQuery connections and query execution."""
 
-    def __init__(self, project_id: str, dataset_id: str, table_id: str):
+    # Table metadata is effectively static for the length of a run, so it is
+    # cached (keyed by table ref) and shared across connector instances
+    _table_info_cache = TTLCache(maxsize=16, ttl=300)
+    _table_info_lock = Lock()
+    # The date range moves as new data lands, so keep it only briefly
+    _date_range_cache = TTLCache(maxsize=16, ttl=60)
+    _date_range_lock = Lock()
+
+    def __init__(
+        self,
+        project_id: str,
+        dataset_id: str,
+        table_id: str,
+        event_date_partition_fields: Tuple[str, ...] = ()
+    ):
         """
         Initialize BigQuery connector.
 
@@ -28,35 +55,123 @@ class BigQueryConnector:
             project_id: GCP project ID
             dataset_id: BigQuery dataset name
             table_id: BigQuery table name
+            event_date_partition_fields: Partitioning columns whose partition
+                dates equal event_date (e.g. ('event_datetime',) when event_date
+                is its UTC date). Lets get_date_range() read partition metadata
+                instead of scanning event_date; empty (always scan) by default.
         """
         self.project_id = project_id
         self.dataset_id = dataset_id
         self.table_id = table_id
+        self.event_date_partition_fields = tuple(event_date_partition_fields)
+        from google.cloud import bigquery
+
         self.client = bigquery.Client(project=project_id)
+        # Storage Read API client, created on first query_arrow() call
+        self._bqs_client = None
+        self._bqs_client_lock = Lock()
         self.table_ref = f"{project_id}.{dataset_id}.{table_id}"
 
-    def query(self, sql: str) -> List[Dict]:
+    def query(self, sql: str, job_config: Optional["bigquery.QueryJobConfig"] = None) -> List[Dict]:
         """
         Execute SQL query and return results as list of dicts.
 
         Args:
             sql: SQL query string
+            job_config: Optional job config (query parameters, cache settings)
 
         Returns:
             List of row dictionaries
         """
+        return self.query_arrow(sql, job_config=job_config).to_pylist()
+
+    def query_arrow(self, sql: str, job_config: Optional["bigquery.QueryJobConfig"] = None) -> "pyarrow.Table":
+        """
+        Execute SQL query and return results as an Arrow table.
+
+        Results are downloaded in columnar batches through the BigQuery
+        Storage API rather than paged row by row over REST.
+
+        Args:
+            sql: SQL query string
+            job_config: Optional job config (query parameters, cache settings)
+
+        Returns:
+            Arrow table of query results
+        """
+        query_job = self.client.query(sql, job_config=job_config)
+        return query_job.result().to_arrow(bqstorage_client=self._get_bqs_client())
+
+    def _get_bqs_client(self):
+        """Return the Storage Read API client, creating it on first use."""
+        with self._bqs_client_lock:
+            if self._bqs_client is None:
+                from google.cloud import bigquery_storage
+
+                self._bqs_client = bigquery_storage.BigQueryReadClient()
+        return self._bqs_client
+
+    def query_sample(self, sql: str, max_rows: int = 100) -> Tuple[List[Dict], int]:
+        """
+        Execute SQL query and return its first rows plus the full row count.
+
+        Only the pages needed to cover max_rows are fetched, so an
+        accidentally unbounded query cannot exhaust memory.
+
+        Args:
+            sql: SQL query string
+            max_rows: Maximum number of rows to fetch
+
+        Returns:
+            Tuple of (up to max_rows row dictionaries, total rows in the result)
+        """
         query_job = self.client.query(sql)
-        results = query_job.result()
+        results = query_job.result(max_results=max_rows, page_size=min(max_rows, 1000))
+        rows = [dict(row) for row in itertools.islice(results, max_rows)]
+        # total_rows counts the whole result, not just the fetched pages
+        total_rows = results.total_rows if results.total_rows is not None else len(rows)
+        return rows, total_rows
+
+    def _cached(self, cache: TTLCache, lock: Lock, fetch: Callable[[], Any]) -> Any:
+        """Return this table's entry from cache, calling fetch() under lock on a miss."""
+        key = hashkey(self.table_ref)
+        # TTLCache is not thread-safe (even lookups reorder and expire
+        # entries), so reads hold the lock too
+        with lock:
+            # [] rather than get(): get() can raise KeyError if the entry
+            # expires between its membership check and the lookup
+            try:
+                return cache[key]
+            except KeyError:
+                pass
+            value = fetch()
+            cache[key] = value
+
+        return value
 
-        # Convert to list of dicts
-        rows = []
-        for row in results:
-            rows.append(dict(row.items()))
+    def bootstrap(self) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Fetch table metadata and date range concurrently and cache both.
+
+        The two lookups are independent (tables.get and a query), so the
+        caller waits for one round trip instead of two. Meant for callers
+        that use both, such as notebooks exploring a table; run_all_checks()
+        only needs the schema and warms get_table_info() alone.
 
-        return rows
+        Returns:
+            Tuple of (get_table_info() result, get_date_range() result)
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            table_info = executor.submit(self.get_table_info)
+            date_range = executor.submit(self.get_date_range)
+            return table_info.result(), date_range.result()
 
     def get_table_info(self) -> Dict[str, Any]:
-        """Get table metadata and sample data."""
+        """Get table metadata, cached for a few minutes per table."""
+        return self._cached(self._table_info_cache, self._table_info_lock, self._get_table_info_uncached)
+
+    def _get_table_info_uncached(self) -> Dict[str, Any]:
+        """Fetch table metadata from the BigQuery API."""
         table = self.client.get_table(self.table_ref)
 
         return {
@@ -67,45 +182,220 @@ class BigQueryConnector:
             'modified': table.modified
         }
 
+    @classmethod
+    def bulk_get_table_info(
+        cls,
+        project_id: str,
+        dataset_id: str,
+        table_ids: List[str],
+        client: Optional["bigquery.Client"] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch metadata for several tables at once and prime the cache.
+
+        Uses INFORMATION_SCHEMA.COLUMNS for schemas and __TABLES__ for
+        row counts and sizes, so N tables cost two metadata queries
+        instead of N tables.get calls.
+
+        Args:
+            project_id: GCP project ID
+            dataset_id: BigQuery dataset name
+            table_ids: BigQuery table names
+            client: Optional existing BigQuery client
+
+        Returns:
+            Dict mapping table_id to the same dict get_table_info returns
+        """
+        from google.cloud import bigquery
+
+        client = client or bigquery.Client(project=project_id)
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ArrayQueryParameter("table_ids", "STRING", table_ids)]
+        )
+
+        columns_sql = f"""
+        SELECT table_name, column_name, data_type
+        FROM `{project_id}.{dataset_id}.INFORMATION_SCHEMA.COLUMNS`
+        WHERE table_name IN UNNEST(@table_ids)
+        ORDER BY table_name, ordinal_position
+        """
+        tables_sql = f"""
+        SELECT table_id, row_count, size_bytes, creation_time, last_modified_time
+        FROM `{project_id}.{dataset_id}.__TABLES__`
+        WHERE table_id IN UNNEST(@table_ids)
+        """
+
+        # Start both jobs before waiting on either
+        columns_job = client.query(columns_sql, job_config=job_config)
+        tables_job = client.query(tables_sql, job_config=job_config)
+
+        schemas: Dict[str, List[Dict[str, str]]] = {table_id: [] for table_id in table_ids}
+        for row in columns_job.result():
+            # Same type names as _get_table_info_uncached, since both fill one cache
+            schemas[row['table_name']].append({
+                'name': row['column_name'],
+                'type': cls._legacy_type_name(row['data_type'])
+            })
+
+        infos = {}
+        for row in tables_job.result():
+            infos[row['table_id']] = {
+                'num_rows': row['row_count'],
+                'size_mb': row['size_bytes'] / 1024 / 1024,
+                'schema': schemas[row['table_id']],
+                'created': datetime.fromtimestamp(row['creation_time'] / 1000, tz=timezone.utc),
+                'modified': datetime.fromtimestamp(row['last_modified_time'] / 1000, tz=timezone.utc)
+            }
+
+        with cls._table_info_lock:
+            for table_id, info in infos.items():
+                cls._table_info_cache[hashkey(f"{project_id}.{dataset_id}.{table_id}")] = info
+
+        return infos
+
+    # INFORMATION_SCHEMA standard-SQL type names that differ from SchemaField.field_type
+    _LEGACY_TYPE_NAMES = {
+        'INT64': 'INTEGER',
+        'FLOAT64': 'FLOAT',
+        'BOOL': 'BOOLEAN',
+        'STRUCT': 'RECORD'
+    }
+
+    @classmethod
+    def _legacy_type_name(cls, data_type: str) -> str:
+        """
+        Map an INFORMATION_SCHEMA data_type to the field_type tables.get reports.
+
+        ARRAY<T> becomes T's name (tables.get marks it REPEATED instead),
+        and parameters such as STRING(10) or STRUCT<...> are dropped.
+        """
+        while data_type.startswith('ARRAY<'):
+            data_type = data_type[len('ARRAY<'):-1]
+        base = data_type.split('<', 1)[0].split('(', 1)[0].strip()
+        return cls._LEGACY_TYPE_NAMES.get(base, base)
+
     def get_date_range(self) -> Dict[str, str]:
-        """Get min/max dates in the table."""
+        """Get min/max dates in the table, cached for a minute per table."""
+        return self._cached(self._date_range_cache, self._date_range_lock, self._get_date_range_uncached)
+
+    def _get_date_range_uncached(self) -> Dict[str, str]:
+        """
+        Get min/max event_date, from partition metadata when possible.
+
+        The INFORMATION_SCHEMA lookup is only tried when
+        event_date_partition_fields is set, and only trusted when the table
+        is DAY/HOUR partitioned on one of those columns and every non-empty
+        partition has a date id. Anything else (no partitioning, ingestion
+        time, MONTH/YEAR, rows in __NULL__ or the streaming buffer) falls
+        back to scanning event_date.
+        """
+        if self.event_date_partition_fields:
+            from google.cloud import bigquery
+
+            job_config = bigquery.QueryJobConfig(
+                query_parameters=[
+                    bigquery.ScalarQueryParameter("table_name", "STRING", self.table_id),
+                    bigquery.ArrayQueryParameter("partition_fields", "STRING", list(self.event_date_partition_fields))
+                ]
+            )
+            # DAY ids are YYYYMMDD and HOUR ids YYYYMMDDHH
+            sql = f"""
+            SELECT
+                SUBSTR(MIN(partition_id), 1, 8) as min_date,
+                SUBSTR(MAX(partition_id), 1, 8) as max_date,
+                COUNTIF(NOT REGEXP_CONTAINS(partition_id, r'^[0-9]{{8}}([0-9]{{2}})?$')) as other_partitions
+            FROM `{self.project_id}.{self.dataset_id}.INFORMATION_SCHEMA.PARTITIONS`
+            WHERE table_name = @table_name
+              AND total_rows > 0
+              AND EXISTS (
+                  SELECT 1
+                  FROM `{self.project_id}.{self.dataset_id}.INFORMATION_SCHEMA.COLUMNS`
+                  WHERE table_name = @table_name
+                    AND is_partitioning_column = 'YES'
+                    AND column_name IN UNNEST(@partition_fields)
+              )
+            """
+            result = self.query(sql, job_config=job_config)[0]
+            if result['min_date'] is not None and result['other_partitions'] == 0:
+                return {'min_date': result['min_date'], 'max_date': result['max_date']}
+
         sql = f"""
         SELECT
             MIN(event_date) as min_date,
             MAX(event_date) as max_date
         FROM `{self.table_ref}`
         """
-        result = self.query(sql)[0]
-        return result
+        return self.query(sql)[0]
 
     def get_event_volume(self, lookback_days: int = 7) -> List[Dict]:
-        """Get event volume by date for recent days."""
+        """
+        Get event volume by date for recent days.
+
+        The start date is computed here and passed as a query parameter
+        rather than using CURRENT_DATE() in SQL, so the query text is
+        identical across calls and deterministic, which lets BigQuery
+        serve repeat calls from its cached results.
+        """
+        from google.cloud import bigquery
+
+        start_date = (datetime.now(timezone.utc).date() - timedelta(days=lookback_days)).strftime('%Y%m%d')
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ScalarQueryParameter("start_date", "STRING", start_date)],
+            use_query_cache=True
+        )
         sql = f"""
         SELECT
             event_date,
             COUNT(*) as event_count,
             COUNT(DISTINCT user_pseudo_id) as unique_users
         FROM `{self.table_ref}`
-        WHERE event_date >= FORMAT_DATE('%Y%m%d', DATE_SUB(CURRENT_DATE(), INTERVAL {lookback_days} DAY))
+        WHERE event_date >= @start_date
         GROUP BY event_date
         ORDER BY event_date
         """
-        return self.query(sql)
+        return self.query(sql, job_config=job_config)
 
 
 class SQLGenerator:
     """Generate SQL queries using AI based on check descriptions."""
 
-    def __init__(self, api_key: str, model: str = "gpt-4"):
+    # Used when cache_dir is not given; ANALYTICS_INTELLIGENCE_SQL_CACHE_DIR
+    # overrides it (set it to an empty string to disable the cache)
+    DEFAULT_CACHE_DIR = "~/.cache/analytics_intelligence/sql"
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4",
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        cache_ttl: int = 7 * 24 * 3600
+    ):
         """
         Initialize SQL generator.
 
         Args:
             api_key: OpenAI API key
             model: OpenAI model to use
+            cache_dir: Directory for the generated-SQL disk cache (None to disable).
+                Defaults to $ANALYTICS_INTELLIGENCE_SQL_CACHE_DIR, then DEFAULT_CACHE_DIR.
+            cache_ttl: Seconds before a cached query is regenerated, so schema drift is picked up
         """
+        import diskcache
+        import openai
+
         self.client = openai.OpenAI(api_key=api_key)
         self.model = model
+        if cache_dir == self.DEFAULT_CACHE_DIR:
+            cache_dir = os.environ.get("ANALYTICS_INTELLIGENCE_SQL_CACHE_DIR", cache_dir)
+
+        # Best effort: serverless runtimes often have no writable HOME
+        self.cache = None
+        if cache_dir:
+            try:
+                self.cache = diskcache.Cache(os.path.expanduser(cache_dir))
+            except (OSError, sqlite3.Error) as e:
+                print(f"SQL cache disabled, cannot open {cache_dir}: {e}")
+        self.cache_ttl = cache_ttl
 
     def generate_sql(
         self,
@@ -126,6 +416,75 @@ class SQLGenerator:
         Returns:
             Generated SQL query string
         """
+        messages = self._build_messages(check_description, table_ref, schema, examples)
+
+        # The prompt is a pure function of the inputs, so reuse earlier generations
+        cache_key = self._cache_key(messages)
+        if self.cache is not None:
+            try:
+                cached_sql = self.cache.get(cache_key)
+            except (OSError, sqlite3.Error):
+                cached_sql = None
+            if cached_sql is not None:
+                return cached_sql
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.3  # Lower temperature for more consistent SQL
+        )
+
+        sql = response.choices[0].message.content.strip()
+
+        # Clean up markdown code blocks if present
+        if sql.startswith("```sql"):
+            sql = sql.replace("```sql", "").replace("```", "").strip()
+        elif sql.startswith("```"):
+            sql = sql.replace("```", "").strip()
+
+        if self.cache is not None:
+            try:
+                self.cache.set(cache_key, sql, expire=self.cache_ttl)
+            except (OSError, sqlite3.Error):
+                pass
+
+        return sql
+
+    def invalidate(
+        self,
+        check_description: str,
+        table_ref: str,
+        schema: List[Dict[str, str]],
+        examples: Optional[str] = None
+    ):
+        """
+        Drop the cached SQL for these generate_sql() arguments.
+
+        Call this when the generated query fails to run, so the next
+        generate_sql() asks the model again instead of serving it from cache.
+        """
+        if self.cache is None:
+            return
+        messages = self._build_messages(check_description, table_ref, schema, examples)
+        try:
+            self.cache.delete(self._cache_key(messages))
+        except (OSError, sqlite3.Error):
+            pass
+
+    def _cache_key(self, messages: List[Dict[str, str]]) -> str:
+        """Disk-cache key for a generation request."""
+        return hashlib.sha256(
+            orjson.dumps({"model": self.model, "messages": messages}, option=orjson.OPT_SORT_KEYS)
+        ).hexdigest()
+
+    def _build_messages(
+        self,
+        check_description: str,
+        table_ref: str,
+        schema: List[Dict[str, str]],
+        examples: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for a generate_sql() request."""
         schema_str = "\n".join([f"  - {col['name']} ({col['type']})" for col in schema])
 
         prompt = f"""You are a BigQuery SQL expert. Generate a SQL query for the following data quality check.
@@ -150,134 +509,203 @@ Requirements:
 
 Generate the SQL query:"""
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a SQL expert. Generate only valid BigQuery SQL queries. Do not include explanations outside the SQL comments."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3  # Lower temperature for more consistent SQL
-        )
-
-        sql = response.choices[0].message.content.strip()
-
-        # Clean up markdown code blocks if present
-        if sql.startswith("```sql"):
-            sql = sql.replace("```sql", "").replace("```", "").strip()
-        elif sql.startswith("```"):
-            sql = sql.replace("```", "").strip()
-
-        return sql
+        return [
+            {"role": "system", "content": "You are a SQL expert. Generate only valid BigQuery SQL queries. Do not include explanations outside the SQL comments."},
+            {"role": "user", "content": prompt}
+        ]
 
 
 class AnomalyClassifier:
     """Classify query results as problems or opportunities using AI."""
 
-    def __init__(self, api_key: str, model: str = "gpt-4"):
+    # Fixed taxonomy, sent once as the system message; the user message
+    # carries only the per-check fields
+    _SYSTEM_MSG = (
+        "You classify analytics findings. Categories: "
+        "problem_critical=tracking broken/PII; problem_minor=data quality; "
+        "opportunity=positive change; insight=pattern; noise=expected variance."
+    )
+
+    # Structured-output schema, built once rather than per call
+    _RESPONSE_FORMAT = {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "classify_finding",
+            "description": "Classify an analytics finding as a problem or opportunity",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "category": {
+                        "type": "string",
+                        "enum": ["problem_critical", "problem_minor", "opportunity", "insight", "noise"],
+                        "description": "Category: problem_critical (tracking broken, PII leak), problem_minor (data quality), opportunity (positive change), insight (pattern worth noting), noise (expected variance)"
+                    },
+                    "severity": {
+                        "type": "string",
+                        "enum": ["high", "medium", "low"],
+                        "description": "Severity level"
+                    },
+                    "title": {
+                        "type": "string",
+                        "description": "Short title for Slack alert (max 100 chars)"
+                    },
+                    "message": {
+                        "type": "string",
+                        "description": "Detailed explanation of the finding"
+                    },
+                    "recommendation": {
+                        "type": "string",
+                        "description": "Recommended action to take"
+                    },
+                    "emoji": {
+                        "type": "string",
+                        "description": "Emoji for alert: 🚨 critical, ⚠️ minor, 🎉 opportunity, 📊 insight, 🔍 noise"
+                    }
+                },
+                "required": ["category", "severity", "title", "message", "recommendation", "emoji"],
+                "additionalProperties": False
+            }
+        }
+    }
+
+    def __init__(self, api_key: str, model: str = "gpt-4o"):
         """
         Initialize anomaly classifier.
 
         Args:
             api_key: OpenAI API key
-            model: OpenAI model to use
+            model: OpenAI model to use (must support JSON-schema structured outputs)
         """
+        import openai
+
         self.client = openai.OpenAI(api_key=api_key)
+        # Kept for classify_many(), which opens an async client per batch
+        self._api_key = api_key
         self.model = model
 
     def classify(
         self,
         check_name: str,
         check_description: str,
-        results: List[Dict],
+        sample: List[Dict],
+        row_count: int,
         context: Optional[Dict] = None
     ) -> Dict[str, Any]:
         """
-        Classify query results using OpenAI function calling.
+        Classify query results using OpenAI structured outputs.
 
         Args:
             check_name: Name of the check
             check_description: Description of what was checked
-            results: Query results (list of row dicts)
+            sample: First few result rows (list of row dicts)
+            row_count: Total number of result rows
             context: Additional context (table stats, recent trends, etc.)
 
         Returns:
             Classification dict with severity, category, message, and recommendation
         """
-        # Summarize results for the prompt
-        result_summary = f"Found {len(results)} rows. "
-        if results:
-            result_summary += f"Sample: {results[0]}"
-
-        functions = [
-            {
-                "name": "classify_finding",
-                "description": "Classify an analytics finding as a problem or opportunity",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "category": {
-                            "type": "string",
-                            "enum": ["problem_critical", "problem_minor", "opportunity", "insight", "noise"],
-                            "description": "Category: problem_critical (tracking broken, PII leak), problem_minor (data quality), opportunity (positive change), insight (pattern worth noting), noise (expected variance)"
-                        },
-                        "severity": {
-                            "type": "string",
-                            "enum": ["high", "medium", "low"],
-                            "description": "Severity level"
-                        },
-                        "title": {
-                            "type": "string",
-                            "description": "Short title for Slack alert (max 100 chars)"
-                        },
-                        "message": {
-                            "type": "string",
-                            "description": "Detailed explanation of the finding"
-                        },
-                        "recommendation": {
-                            "type": "string",
-                            "description": "Recommended action to take"
-                        },
-                        "emoji": {
-                            "type": "string",
-                            "description": "Emoji for alert: 🚨 critical, ⚠️ minor, 🎉 opportunity, 📊 insight, 🔍 noise"
-                        }
-                    },
-                    "required": ["category", "severity", "title", "message", "recommendation", "emoji"]
-                }
-            }
-        ]
+        request = self._build_request(check_name, check_description, sample, row_count, context)
+        response = self.client.chat.completions.create(**request)
+        return self._parse_response(response, check_name, row_count)
+
+    async def classify_many(
+        self,
+        jobs: List[Dict[str, Any]],
+        max_concurrency: int = 8
+    ) -> List[Any]:
+        """
+        Classify several findings concurrently.
+
+        A subclass that overrides classify() keeps its behaviour here:
+        each job then runs through that override in a worker thread
+        instead of the built-in async OpenAI request.
+
+        Args:
+            jobs: List of classify() keyword-argument dicts
+                (check_name, check_description, sample, row_count, optional context)
+            max_concurrency: Maximum number of in-flight OpenAI requests
 
-        prompt = f"""Analyze this analytics finding and classify it.
+        Returns:
+            List in the same order as jobs; each item is a classification
+            dict, or the exception raised while classifying that job
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        if type(self).classify is not AnomalyClassifier.classify:
+            return await asyncio.gather(
+                *[self._classify_one_override(semaphore, job) for job in jobs],
+                return_exceptions=True
+            )
 
-Check name: {check_name}
-Description: {check_description}
-Results: {result_summary}
-{f"Context: {context}" if context else ""}
+        import openai
 
-Determine if this is:
-- problem_critical: Tracking is broken, PII leak, or major data issue
-- problem_minor: Data quality issue that should be fixed but not urgent
-- opportunity: Positive change worth investigating (spike in conversions, new high-value traffic source)
-- insight: Interesting pattern or trend worth noting
-- noise: Expected variance, not actionable
+        # The async client's pooled connections belong to the running event
+        # loop, so open a fresh client per batch and close it before returning
+        async with openai.AsyncOpenAI(api_key=self._api_key) as aclient:
+            return await asyncio.gather(
+                *[self._classify_one(aclient, semaphore, **job) for job in jobs],
+                return_exceptions=True
+            )
 
-Provide classification:"""
+    async def _classify_one_override(self, semaphore: asyncio.Semaphore, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Run an overridden classify() for one job in a thread, bounded by semaphore."""
+        async with semaphore:
+            return await asyncio.to_thread(self.classify, **job)
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            functions=functions,
-            function_call={"name": "classify_finding"}
+    async def _classify_one(
+        self,
+        aclient: "openai.AsyncOpenAI",
+        semaphore: asyncio.Semaphore,
+        check_name: str,
+        check_description: str,
+        sample: List[Dict],
+        row_count: int,
+        context: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Async counterpart of classify(), bounded by semaphore."""
+        request = self._build_request(check_name, check_description, sample, row_count, context)
+        async with semaphore:
+            response = await aclient.chat.completions.create(**request)
+        return self._parse_response(response, check_name, row_count)
+
+    def _build_request(
+        self,
+        check_name: str,
+        check_description: str,
+        sample: List[Dict],
+        row_count: int,
+        context: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Build the chat completion arguments for a classification."""
+        prompt = (
+            f"check={check_name}\n"
+            f"desc={check_description}\n"
+            f"rows={row_count}\n"
+            f"sample={sample[0] if sample else None!r}\n"
+            f"ctx={context or ''}"
         )
 
-        # Parse function call result
-        function_call = response.choices[0].message.function_call
-        import json
-        classification = json.loads(function_call.arguments)
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self._SYSTEM_MSG},
+                {"role": "user", "content": prompt}
+            ],
+            "response_format": self._RESPONSE_FORMAT
+        }
+
+    def _parse_response(self, response: Any, check_name: str, row_count: int) -> Dict[str, Any]:
+        """Turn a chat completion response into a classification dict."""
+        message = response.choices[0].message
+        if getattr(message, 'refusal', None):
+            raise ValueError(f"Classification refused: {message.refusal}")
+
+        # Strict structured output guarantees content matches the schema
+        classification = orjson.loads(message.content)
 
         classification['check_name'] = check_name
-        classification['result_count'] = len(results)
-        classification['timestamp'] = datetime.utcnow().isoformat()
+        classification['result_count'] = row_count
+        classification['timestamp'] = datetime.now(timezone.utc).isoformat(timespec="seconds")
 
         return classification
 
@@ -285,6 +713,16 @@ Provide classification:"""
 class SlackAlerter:
     """Send alerts to Slack via webhook."""
 
+    # Color based on category
+    _COLOR_MAP = {
+        'problem_critical': '#FF0000',  # Red
+        'problem_minor': '#FFA500',     # Orange
+        'opportunity': '#00FF00',        # Green
+        'insight': '#0000FF',            # Blue
+        'noise': '#808080'               # Gray
+    }
+    _CATEGORY_LABEL = {category: category.replace('_', ' ').title() for category in _COLOR_MAP}
+
     def __init__(self, webhook_url: str):
         """
         Initialize Slack alerter.
@@ -292,18 +730,29 @@ class SlackAlerter:
         Args:
             webhook_url: Slack webhook URL
         """
+        import requests
+        from requests.adapters import HTTPAdapter
+
         self.webhook_url = webhook_url
 
-    def send_alert(self, classification: Dict[str, Any], results: Optional[List[Dict]] = None):
+        # Reuse connections to Slack instead of a new TLS handshake per alert
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+    def send_alert(
+        self,
+        classification: Dict[str, Any],
+        sample: Optional[List[Dict]] = None,
+        row_count: Optional[int] = None
+    ):
         """
         Send alert to Slack.
 
         Args:
             classification: Classification dict from AnomalyClassifier
-            results: Optional query results to include in details
+            sample: Optional sample rows to include in details (first 3 are shown)
+            row_count: Total number of result rows (defaults to len(sample))
         """
-        import requests
-
         emoji = classification.get('emoji', '📊')
         title = classification.get('title', 'Analytics Alert')
         message = classification.get('message', '')
@@ -311,15 +760,7 @@ class SlackAlerter:
         category = classification.get('category', 'insight')
         recommendation = classification.get('recommendation', '')
 
-        # Color based on category
-        color_map = {
-            'problem_critical': '#FF0000',  # Red
-            'problem_minor': '#FFA500',     # Orange
-            'opportunity': '#00FF00',        # Green
-            'insight': '#0000FF',            # Blue
-            'noise': '#808080'               # Gray
-        }
-        color = color_map.get(category, '#808080')
+        color = self._COLOR_MAP.get(category, '#808080')
 
         # Build Slack message
         slack_message = {
@@ -330,7 +771,7 @@ class SlackAlerter:
                     "fields": [
                         {
                             "title": "Category",
-                            "value": category.replace('_', ' ').title(),
+                            "value": self._CATEGORY_LABEL.get(category) or category.replace('_', ' ').title(),
                             "short": True
                         },
                         {
@@ -356,33 +797,56 @@ class SlackAlerter:
         }
 
         # Add sample results if provided
-        if results and len(results) > 0:
-            result_text = "Sample results:\n```\n"
-            for row in results[:3]:  # First 3 rows
-                result_text += f"{row}\n"
-            result_text += "```"
+        if sample:
+            if row_count is None:
+                row_count = len(sample)
+            # First 3 rows as JSON; default=str covers NUMERIC (Decimal) values
+            rows_json = "\n".join(orjson.dumps(row, default=str).decode() for row in sample[:3])
+            result_text = f"Sample results:\n```\n{rows_json}\n```"
             slack_message["attachments"][0]["fields"].append({
-                "title": f"Sample Results ({len(results)} total)",
+                "title": f"Sample Results ({row_count} total)",
                 "value": result_text,
                 "short": False
             })
 
         # Send to Slack
-        response = requests.post(self.webhook_url, json=slack_message)
+        response = self.session.post(
+            self.webhook_url,
+            data=orjson.dumps(slack_message),
+            headers={"Content-Type": "application/json"},
+            timeout=10
+        )
         response.raise_for_status()
 
         return response.status_code == 200
 
 
+def _run_coroutine(coro: Coroutine) -> Any:
+    """Run a coroutine to completion, even if an event loop is already running (e.g. Jupyter)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
 class CheckRunner:
     """Run checks from YAML configuration."""
 
+    # Rows fetched per check for the classifier prompt and Slack alert
+    SAMPLE_ROWS = 3
+    # Checks returning fewer rows than this are treated as noise without an LLM call
+    MIN_ROWS_FOR_CLASSIFY = 1
+
     def __init__(
         self,
         bq_connector: BigQueryConnector,
         sql_generator: SQLGenerator,
         classifier: AnomalyClassifier,
-        alerter: Optional[SlackAlerter] = None
+        alerter: Optional[SlackAlerter] = None,
+        min_rows_for_classify: int = MIN_ROWS_FOR_CLASSIFY
     ):
         """
         Initialize check runner.
@@ -392,16 +856,61 @@ class CheckRunner:
             sql_generator: SQL generator
             classifier: Anomaly classifier
             alerter: Optional Slack alerter
+            min_rows_for_classify: Minimum result rows before a finding is sent to the classifier
         """
         self.bq = bq_connector
         self.sql_gen = sql_generator
         self.classifier = classifier
         self.alerter = alerter
+        self.min_rows_for_classify = min_rows_for_classify
+        self._print_lock = Lock()
+
+    def _print(self, *args, **kwargs):
+        """Print without interleaving output from concurrently running checks."""
+        with self._print_lock:
+            print(*args, **kwargs)
 
     def load_checks(self, yaml_file: str) -> List[Dict]:
-        """Load check definitions from YAML file."""
-        with open(yaml_file, 'r') as f:
-            config = yaml.safe_load(f)
+        """
+        Load check definitions from YAML file.
+
+        The parsed config is cached as JSON next to the YAML file
+        (<yaml_file>.cache.json), keyed by a hash of the YAML content.
+        Configs that would not come back identical from JSON (e.g. YAML
+        dates) are never cached.
+        """
+        with open(yaml_file, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        cache_file = f"{yaml_file}.cache.json"
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = orjson.loads(f.read())
+            if isinstance(cached, dict) and cached.get('sha256') == digest:
+                return cached['config'].get('checks', [])
+        except (OSError, orjson.JSONDecodeError):
+            pass
+
+        import yaml
+        try:
+            from yaml import CSafeLoader as Loader
+        except ImportError:
+            from yaml import SafeLoader as Loader
+
+        config = yaml.load(raw, Loader=Loader)
+
+        # Best effort: skip the cache for read-only dirs or configs JSON can't represent exactly
+        try:
+            payload = orjson.dumps({'sha256': digest, 'config': config})
+            if orjson.loads(payload)['config'] == config:
+                tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+                with open(tmp_file, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_file, cache_file)
+        except (OSError, orjson.JSONEncodeError):
+            pass
+
         return config.get('checks', [])
 
     def run_check(self, check: Dict) -> Dict[str, Any]:
@@ -414,82 +923,200 @@ class CheckRunner:
         Returns:
             Check result with classification
         """
+        sql, sample, row_count = self._execute_check(check)
+
+        classification, job = self._plan_classification(check, sample, row_count)
+        if job is not None:
+            classification = self.classifier.classify(**job)
+
+        return self._report_check(check['name'], sql, sample, row_count, classification)
+
+    def _plan_classification(
+        self,
+        check: Dict,
+        sample: List[Dict],
+        row_count: int
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Decide how a check's results get classified.
+
+        Used by both run_check() and run_all_checks(), so overriding this
+        changes single and batch runs alike.
+
+        Returns:
+            Tuple of (classification, job). job is the classify() keyword
+            arguments when the LLM is needed, otherwise None and
+            classification is final (None when there are no results).
+        """
+        if row_count == 0:
+            return None, None
+        if row_count < self.min_rows_for_classify:
+            return self._noise_classification(check['name'], row_count), None
+        return None, {
+            'check_name': check['name'],
+            'check_description': check['description'],
+            'sample': sample,
+            'row_count': row_count
+        }
+
+    def _execute_check(self, check: Dict) -> Tuple[str, List[Dict], int]:
+        """Generate SQL for a check if needed, run it, and return (sql, sample, row_count)."""
         check_name = check['name']
         check_description = check['description']
 
-        print(f"Running check: {check_name}")
+        self._print(f"Running check: {check_name}")
 
         # Generate SQL if not provided
+        generation = None
         if 'sql' in check:
             sql = check['sql']
         else:
             table_info = self.bq.get_table_info()
-            sql = self.sql_gen.generate_sql(
-                check_description=check_description,
-                table_ref=self.bq.table_ref,
-                schema=table_info['schema'],
-                examples=check.get('examples')
-            )
-            print(f"Generated SQL:\n{sql}\n")
+            generation = {
+                'check_description': check_description,
+                'table_ref': self.bq.table_ref,
+                'schema': table_info['schema'],
+                'examples': check.get('examples')
+            }
+            sql = self.sql_gen.generate_sql(**generation)
+            self._print(f"[{check_name}] Generated SQL:\n{sql}\n")
 
         # Execute query
-        results = self.bq.query(sql)
-        print(f"Found {len(results)} results")
-
-        # Classify if results found
-        if len(results) > 0:
-            classification = self.classifier.classify(
-                check_name=check_name,
-                check_description=check_description,
-                results=results
-            )
-            print(f"Classification: {classification['category']} ({classification['severity']})")
+        # Only a few rows are needed downstream, so fetch just those;
+        # the row count still reflects the full result
+        try:
+            sample, row_count = self.bq.query_sample(sql, max_rows=self.SAMPLE_ROWS)
+        except Exception:
+            # Don't keep serving generated SQL that failed; regenerate next run
+            if generation is not None:
+                self.sql_gen.invalidate(**generation)
+            raise
+        self._print(f"[{check_name}] Found {row_count} results")
+
+        return sql, sample, row_count
+
+    def _noise_classification(self, check_name: str, row_count: int) -> Dict[str, Any]:
+        """Classification for findings below min_rows_for_classify, built without an LLM call."""
+        return {
+            'category': 'noise',
+            'severity': 'low',
+            'title': f"{check_name}: {row_count} rows (below classification threshold)",
+            'message': f"Returned {row_count} rows, fewer than the {self.min_rows_for_classify} needed for classification.",
+            'recommendation': 'No action needed.',
+            'emoji': '🔍',
+            'check_name': check_name,
+            'result_count': row_count,
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec="seconds")
+        }
+
+    def _report_check(
+        self,
+        check_name: str,
+        sql: str,
+        sample: List[Dict],
+        row_count: int,
+        classification: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Send any alert for a classified check and build its result dict."""
+        if classification is not None:
+            self._print(f"[{check_name}] Classification: {classification['category']} ({classification['severity']})")
 
             # Send alert if configured
             if self.alerter and classification['category'] != 'noise':
-                print("Sending Slack alert...")
-                self.alerter.send_alert(classification, results)
+                self._print(f"[{check_name}] Sending Slack alert...")
+                self.alerter.send_alert(classification, sample, row_count)
 
             return {
                 'check': check_name,
                 'sql': sql,
-                'results': results,
+                'results': sample,
+                'row_count': row_count,
                 'classification': classification
             }
         else:
-            print("No results found - check passed")
+            self._print(f"[{check_name}] No results found - check passed")
             return {
                 'check': check_name,
                 'sql': sql,
                 'results': [],
+                'row_count': 0,
                 'classification': None
             }
 
-    def run_all_checks(self, yaml_file: str) -> List[Dict[str, Any]]:
+    def _error_result(self, check: Dict, error: Exception) -> Dict[str, Any]:
+        """Report a failed check and build its result dict."""
+        self._print(f"Error running check {check.get('name', 'unknown')}: {error}\n")
+        return {
+            'check': check.get('name', 'unknown'),
+            'error': str(error)
+        }
+
+    def run_all_checks(self, yaml_file: str, max_workers: int = 16) -> List[Dict[str, Any]]:
         """
         Run all checks from YAML file.
 
+        Table metadata is prefetched once if any check needs generated SQL,
+        then SQL generation and BigQuery execution run in a thread pool.
+        All findings are then classified together with
+        AnomalyClassifier.classify_many().
+
         Args:
             yaml_file: Path to checks YAML file
+            max_workers: Maximum number of checks to execute at once
 
         Returns:
-            List of check results
+            List of check results, in the same order as the YAML file
         """
         checks = self.load_checks(yaml_file)
-        results = []
+        results: List[Optional[Dict[str, Any]]] = [None] * len(checks)
 
         print(f"Running {len(checks)} checks from {yaml_file}\n")
 
-        for check in checks:
+        if not checks:
+            return []
+
+        # Warm the table-info cache once so checks that generate SQL
+        # don't each wait on the first tables.get. Not bootstrap(): checks
+        # never use the date range, which may cost an event_date scan
+        if any('sql' not in check for check in checks):
+            try:
+                self.bq.get_table_info()
+            except Exception:
+                pass  # each affected check reports the error itself
+
+        # Generate and execute SQL for every check
+        executed: Dict[int, Tuple[str, List[Dict], int]] = {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(checks))) as executor:
+            futures = {executor.submit(self._execute_check, check): i for i, check in enumerate(checks)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    executed[i] = future.result()
+                except Exception as e:
+                    results[i] = self._error_result(checks[i], e)
+
+        # Classify every check that returned enough rows in one concurrent batch
+        classifications = {}
+        findings = []
+        jobs = []
+        for i in sorted(executed):
+            _, sample, row_count = executed[i]
+            classifications[i], job = self._plan_classification(checks[i], sample, row_count)
+            if job is not None:
+                findings.append(i)
+                jobs.append(job)
+        if jobs:
+            classifications.update(zip(findings, _run_coroutine(self.classifier.classify_many(jobs))))
+
+        # Alert and collect results
+        for i in sorted(executed):
+            sql, sample, row_count = executed[i]
+            classification = classifications.get(i)
             try:
-                result = self.run_check(check)
-                results.append(result)
-                print()
+                if isinstance(classification, BaseException):
+                    raise classification
+                results[i] = self._report_check(checks[i]['name'], sql, sample, row_count, classification)
             except Exception as e:
-                print(f"Error running check {check.get('name', 'unknown')}: {e}\n")
-                results.append({
-                    'check': check.get('name', 'unknown'),
-                    'error': str(e)
-                })
+                results[i] = self._error_result(checks[i], e)
 
         return results